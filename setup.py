@@ -1,4 +1,5 @@
-import subprocess
+import os
+import shutil
 from pathlib import Path
 
 from setuptools import setup
@@ -6,12 +7,6 @@ from setuptools.command.install import install
 
 from _version import __version__
 
-script = f"""
-chmod +x versionator.py
-mkdir -p {Path.home()}/bin/
-cp versionator.py {Path.home()}/bin/versionator
-"""
-
 
 class PostInstallCommand(install):
     """Pre-installation for installation mode."""
@@ -19,9 +14,11 @@ class PostInstallCommand(install):
     def run(self):
         super().run()
         print("Running post install script")
-        for cmd in script.split("\n"):
-            if cmd.strip():
-                subprocess.run(cmd, shell=True, check=True)
+        bin_dir = Path.home() / "bin"
+        bin_dir.mkdir(parents=True, exist_ok=True)
+        target = bin_dir / "versionator"
+        shutil.copy2("versionator.py", target)
+        os.chmod(target, 0o755)
 
 
 setup(
@@ -1,10 +1,15 @@
 #!/usr/bin/env python
 
-import argparse
-import re
-import subprocess
+from __future__ import annotations
+
+import sys
 from dataclasses import dataclass
 from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
 
 __all__ = [
     "MultipleFilesFoundError",
@@ -13,27 +18,71 @@ __all__ = [
     "update_version_info",
     "version2info",
     "info2version",
+    "find_version_span",
+    "tag_exists",
     "get_latest_tag",
 ]
 
+VersionInfo = tuple[int, int, int]
+
 DEFAULT_VERSION = "0.0.0"
-COMMIT_MSG = '"chore: update version"'
+COMMIT_MSG = "chore: update version"
+
+# Completion words for each subcommand, served by `tab_complete`. Kept static so
+# bash's per-TAB queries are answered without argparse; update it together with
+# `get_parser` when adding subcommands or options.
+COMPLETIONS = {
+    "bump": "major big minor small patch fix bugfix -t --tag -d --dryrun -h --help",
+    "tag": "-d --dryrun -h --help",
+    "info": "--version-info --tag --version -h --help",
+}
+VERSION_PREFIX = b'__version__ = "'
+
+# Stage, commit and tag in a single shell so `Versionator.tag` spawns one process
+# instead of one per git command. Arguments are passed positionally (never
+# interpolated): $1 file, $2 commit message, $3 version. The tag message is read
+# from stdin so it needs no quoting. Failed steps are rolled back inside the
+# script and the exit code tells the caller which step failed:
+# 1 add, 2 commit, 3 tag.
+TAG_SCRIPT = """
+file=$1 msg=$2 version=$3
+git add -- "$file" || exit 1
+committed=0
+if [ -n "$(git status --porcelain -- "$file")" ]; then
+    git commit -q -m "$msg" || { git reset -q -- "$file"; exit 2; }
+    committed=1
+fi
+if ! git tag -a "$version" -F -; then
+    [ $committed = 0 ] || git reset -q --soft HEAD~
+    git reset -q -- "$file"
+    exit 3
+fi
+"""
 
 
 class Identifiers:
     MAJOR = ("major", "big")
     MINOR = ("minor", "small")
     PATCH = ("patch", "fix", "bugfix")
+    _NAMES = MAJOR + MINOR + PATCH
 
     @classmethod
     def names(cls) -> tuple[str, ...]:
-        return cls.MAJOR + cls.MINOR + cls.PATCH
+        return cls._NAMES
 
     @classmethod
     def names_repr(cls) -> str:
         return ", ".join(map(repr, cls.names()))
 
 
+# Index of the version part each identifier bumps: major 0, minor 1, patch 2
+BUMP_INDEX = {
+    **dict.fromkeys(Identifiers.MAJOR, 0),
+    **dict.fromkeys(Identifiers.MINOR, 1),
+    **dict.fromkeys(Identifiers.PATCH, 2),
+}
+
+
 @dataclass
 class MultipleFilesFoundError(OSError):
     files: list[Path]
@@ -46,82 +95,66 @@ class MultipleFilesFoundError(OSError):
 class Versionator:
     def __init__(self) -> None:
         self.version_path: Path = self._get_version_file()
+        self._version: str | None = None
 
     @property
     def version(self) -> str:
-        return self._extract_version_from_file()
+        if self._version is None:
+            self._version = self._extract_version_from_file()
+        return self._version
 
     @property
-    def version_info(self) -> list[int]:
+    def version_info(self) -> VersionInfo:
         return version2info(self.version)
 
     def bump_version(self, identifier: str, dryrun: bool = False) -> None:
         file: Path = self.version_path
-        version: str = self.version
+        content, start, end = self._read_and_find()
+        version: str = content[start:end].decode()
 
-        new_version_info = update_version_info(self.version_info, identifier)
+        new_version_info = update_version_info(version2info(version), identifier)
         new_version: str = info2version(new_version_info)
 
         if dryrun:
             print(f'Updating version "{version}" to "{new_version}"')
             return
 
-        current_content = file.read_text()
-        new_content = current_content.replace(
-            f'__version__ = "{version}"', f'__version__ = "{new_version}"'
-        )
-        file.write_text(new_content)
+        # Splice the new version over the old one
+        file.write_bytes(content[:start] + new_version.encode() + content[end:])
+        self._version = new_version
 
     def tag(self, tag_message: str, dryrun: bool = False) -> None:
+        import subprocess
+
         file: Path = self.version_path
         version: str = self.version
 
-        def prepare_tag_message(msg: str) -> str:
-            if not msg:
-                return '-m ""'
-            msg_lines = msg.split("\n")
-            msg_lines = [line.strip() for line in msg_lines if line.strip()]
-            msg = " ".join(f'-m "{line}"' for line in msg_lines)
-            return msg
-
         if dryrun:
             print(
-                f"Staging {file}, commiting with message {COMMIT_MSG} "
-                f"and tagging {version} with '{prepare_tag_message(tag_message)}'"
+                f"Staging {file}, commiting with message {COMMIT_MSG!r} "
+                f"and tagging {version} with {tag_message!r}"
             )
             return
 
         # Check if version is valid for tagging
-        if get_latest_tag() == version:
+        if tag_exists(version):
             raise RuntimeError(f"Not tagging! Version {version} is already tagged.")
 
         # Add, commit, tag . Return code 0 means success
-        cmd = f"git add {file}"
-        process = subprocess.run(cmd, shell=True)
-        if process.returncode != 0:
-            print(f"Failed '{cmd}' . Rolling back changes")
-            exit(1)
-
-        cmd = f"git commit -m {COMMIT_MSG}"
-        process = subprocess.run(cmd, shell=True, capture_output=True)
-        if (process.returncode != 0) and (
-            "nothing to commit" not in process.stderr.decode() + process.stdout.decode()
-        ):
-            print(f"{process.stdout.decode()}")
-            print(f"{process.stderr.decode()}")
-            print(f"Failed '{cmd}' . Rolling back changes")
-            subprocess.run(f"git reset {file}", shell=True)
-            exit(1)
-
-        cmd = f"git tag -a {version} {prepare_tag_message(tag_message)}"
-        process = subprocess.run(cmd, shell=True)
-        if process.returncode != 0:
-            print(f"Failed '{cmd}' . Rolling back changes")
-            subprocess.run("git reset --soft HEAD~", shell=True)
-            subprocess.run(f"git reset {file}", shell=True)
-            exit(1)
+        cmd = ["sh", "-c", TAG_SCRIPT, "sh", str(file), COMMIT_MSG, version]
+        process = subprocess.run(cmd, input=tag_message.encode(), close_fds=False)
+        if process.returncode == 0:
+            return
+
+        failed = {1: "git add", 2: "git commit"}.get(process.returncode, "git tag")
+        print(f"Failed {failed!r} . Rolled back changes")
+        exit(1)
 
     def _get_version_file(self) -> Path:
+        file = Path("_version.py")
+        if file.is_file():
+            return file
+
         files = list(Path(".").glob("_version.py"))
         if len(files) == 1:
             return files[0]
@@ -135,52 +168,94 @@ class Versionator:
         raise FileNotFoundError(f"Could not find _version.py in {Path.cwd()}. {_help}")
 
     def _extract_version_from_file(self) -> str:
+        content, start, end = self._read_and_find()
+        version = content[start:end].decode()
+        return version
+
+    def _read_and_find(self) -> tuple[bytes, int, int]:
         file: Path = self.version_path
-        version_file_content = file.read_text()
-        match = re.compile(r'__version__ = "(?P<version>\d+\.\d+\.\d+)"').match(
-            version_file_content
-        )
-        if not match:
+        version_file_content = file.read_bytes()
+        span = find_version_span(version_file_content)
+        if span is None:
             raise ValueError("Could not find version in _version.py")
 
-        version = match.groupdict()["version"]
-        return version
+        return version_file_content, *span
 
 
-def update_version_info(version_info: list[int], identifier: str) -> list[int]:
-    if identifier not in Identifiers.names():
+def update_version_info(version_info: VersionInfo, identifier: str) -> VersionInfo:
+    index = BUMP_INDEX.get(identifier.lower())
+    if index is None:
         raise ValueError(
             f"Expected one of {Identifiers.names_repr()}. Got: {identifier.lower()!r}"
         )
 
-    if identifier.lower() in Identifiers.MAJOR:
-        version_info[0] += 1
-        version_info[1] = 0
-        version_info[2] = 0
-    elif identifier.lower() in Identifiers.MINOR:
-        version_info[1] += 1
-        version_info[2] = 0
-    elif identifier.lower() in Identifiers.PATCH:
-        version_info[2] += 1
+    major, minor, patch = version_info
+    if index == 0:
+        return (major + 1, 0, 0)
+    if index == 1:
+        return (major, minor + 1, 0)
+    return (major, minor, patch + 1)
+
 
-    return version_info
+def version2info(version: str) -> VersionInfo:
+    major, minor, patch = version.split(".")
+    return (int(major), int(minor), int(patch))
 
 
-def version2info(version: str) -> list[int]:
-    return list(map(int, version.split(".")))
+def info2version(info: VersionInfo) -> str:
+    major, minor, patch = info
+    return f"{major}.{minor}.{patch}"
 
 
-def info2version(info: list[int]) -> str:
-    return ".".join(list(map(str, info)))
+def find_version_span(content: bytes) -> tuple[int, int] | None:
+    """Find the version of a line starting with `__version__ = "X.Y.Z"`.
+    Returns the start and end offsets of `X.Y.Z` in `content`, or None.
+    """
+    start = content.find(VERSION_PREFIX)
+    while start >= 0:
+        if start == 0 or content[start - 1] == ord("\n"):
+            begin = start + len(VERSION_PREFIX)
+            end = content.find(b'"', begin)
+            parts = content[begin:end].split(b".") if end >= 0 else []
+            if len(parts) == 3 and all(part.isdigit() for part in parts):
+                return begin, end
+        start = content.find(VERSION_PREFIX, start + 1)
+    return None
+
+
+def tag_exists(tag: str) -> bool:
+    """Check whether `tag` exists by reading the refs in ./.git directly.
+    Falls back to asking git when ./.git is not a plain refs-based directory
+    (worktrees, submodules, reftable, or running outside the repository root).
+    """
+    git_dir = Path(".git")
+    if git_dir.is_dir() and not (git_dir / "reftable").exists():
+        if (git_dir / "refs" / "tags" / tag).is_file():
+            return True
+        packed_refs = git_dir / "packed-refs"
+        return packed_refs.is_file() and (
+            f" refs/tags/{tag}\n".encode() in packed_refs.read_bytes()
+        )
+
+    import subprocess
+
+    process = subprocess.run(
+        ["git", "rev-parse", "--quiet", "--verify", f"refs/tags/{tag}"],
+        capture_output=True,
+        close_fds=False,
+    )
+    return process.returncode == 0
 
 
 def get_latest_tag() -> str:
+    import subprocess
+
     return (
         subprocess.run(
-            "git describe --abbrev=0 --tags",
-            shell=True,
+            ["git", "describe", "--abbrev=0", "--tags"],
             capture_output=True,
             check=True,
+            close_fds=False,
         )
         .stdout.decode()
         .strip("\n")
@@ -188,6 +263,8 @@ def get_latest_tag() -> str:
 
 
 def get_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Update version and tag it with a message"
     )
@@ -241,13 +318,31 @@ def get_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def get_fast_args() -> SimpleNamespace | None:
+    """Parse the plain `bump <identifier>` invocation without building the
+    argparse parser. Returns None for anything else.
+    """
+    if len(sys.argv) == 3 and sys.argv[1] == "bump":
+        if sys.argv[2] in BUMP_INDEX:
+            # dryrun and tag_message mirror the bump defaults in `get_parser`
+            return SimpleNamespace(
+                action="bump", identifier=sys.argv[2], dryrun=False, tag_message=None
+            )
+    return None
+
+
 def get_args(parser: argparse.ArgumentParser) -> argparse.Namespace:
     args = parser.parse_args()
     return args
 
 
-def main(parser: argparse.ArgumentParser) -> None:
-    args = get_args(parser)
+def main() -> None:
+    tab_complete()
+
+    fast_args = get_fast_args()
+    args: SimpleNamespace | argparse.Namespace = (
+        fast_args if fast_args is not None else get_args(get_parser())
+    )
 
     versionator = Versionator()
 
@@ -264,41 +359,16 @@ def main(parser: argparse.ArgumentParser) -> None:
         if args.about == "version":
             print(versionator.version)
         elif args.about == "version-info":
-            print(version2info(versionator.version))
+            print(list(version2info(versionator.version)))
         elif args.about == "tag":
             print(get_latest_tag())
 
 
-def tab_complete(parser: argparse.ArgumentParser):
+def tab_complete():
     """Bash autocomplete for subcommands and actions.
     This function is called when the script is run with
     the argument BASH_COMPLETION and the argument SUBCOMMANDS or ACTIONS {subcommand}}
     """
-
-    def get_commands_and_options(parser):
-        subparsers_and_options = {}
-        for action in parser._actions:
-            if not isinstance(action, argparse._SubParsersAction):
-                continue
-            for subparser_name, subparser in action.choices.items():
-                options = []
-                for option in subparser._actions:
-                    if "-h" in option.option_strings:
-                        continue
-                    if option.choices:
-                        options.extend(option.choices)
-                    options.extend(option.option_strings)
-                subparsers_and_options[subparser_name] = options + ["-h", "--help"]
-        return subparsers_and_options
-
-    def __get_commands():
-        return " ".join(get_commands_and_options(parser).keys())
-
-    def __get_command_options(subcommand: str):
-        return " ".join(get_commands_and_options(parser)[subcommand])
-
-    import sys
-
     if "COMPLETION" in sys.argv[1:]:
         if "INIT" in sys.argv[1:]:
             print(
@@ -346,7 +416,7 @@ complete -F _versionator_complete versionator
             exit(0)
         elif "COMMANDS" in sys.argv[1:]:
             if len(sys.argv) in (3, 4):
-                print(__get_commands())
+                print(" ".join(COMPLETIONS))
                 exit(0)
 
             _help = (
@@ -357,7 +427,7 @@ complete -F _versionator_complete versionator
             )
         elif "OPTIONS" in sys.argv[1:]:
             if len(sys.argv) in (4, 5):
-                print(__get_command_options(sys.argv[~0]))
+                print(COMPLETIONS[sys.argv[~0]])
                 exit(0)
 
             _help = (
@@ -382,6 +452,4 @@ complete -F _versionator_complete versionator
 
 
 if __name__ == "__main__":
-    parser = get_parser()
-    tab_complete(parser)
-    main(parser)
+    main()